@@ -1,5 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+import hashlib
+import io
+import pickle
 import sys
 
 from utils.file_handler import (
@@ -7,16 +11,9 @@ from utils.file_handler import (
     parse_transactions,
     validate_and_filter
 )
-from utils.data_processor import (
-    calculate_total_revenue,
-    region_wise_sales,
-    top_selling_products,
-    low_performing_products,
-    customer_analysis,
-    daily_sales_trend,
-    find_peak_sales_day
-)
+from utils.data_processor import SalesStats, compute_all_stats
 from utils.api_handler import (
+    request_products,
     fetch_all_products,
     create_product_mapping,
     enrich_sales_data,
@@ -24,19 +21,8 @@ from utils.api_handler import (
 )
 
 
-class Tee:
-    """Redirect print output to a file only"""
-    def __init__(self, file):
-        self.file = file
-
-    def write(self, data):
-        self.file.write(data)
-
-    def flush(self):
-        self.file.flush()
-
-
 def main():
+    out_f = None
     try:
         # ----------------------------------------
         # Setup output file (RESET each run)
@@ -46,8 +32,9 @@ def main():
         output_dir.mkdir(exist_ok=True)
         output_file = output_dir / "output.txt"
 
-        with open(output_file, "w", encoding="utf-8"):
-            pass  # clear file
+        # open once (truncating) and keep the handle for every write
+        # below, instead of re-opening the file per section
+        out_f = open(output_file, "w", encoding="utf-8")
 
         # ========================================
         # TERMINAL OUTPUT (MUST NOT CHANGE)
@@ -61,7 +48,7 @@ def main():
         # [1/10] Reading sales data
         # ----------------------------------------
         print("[1/10] Reading sales data...")
-        raw_lines, discarded_read = read_sales_data("sales_data.txt")
+        raw_lines, discarded_read, fingerprint = read_sales_data("sales_data.txt")
         print(f"✓ Successfully read {len(raw_lines)} transactions\n")
 
         # ----------------------------------------
@@ -75,7 +62,7 @@ def main():
         # [3/10] Filter Options Available
         # ----------------------------------------
         print("[3/10] Filter Options Available:")
-        validate_and_filter(parsed_txns)
+        _, _, filter_info = validate_and_filter(parsed_txns, prevalidated=True)
         print()
 
         choice = input("Do you want to filter data? (y/n): ").strip().lower()
@@ -100,80 +87,128 @@ def main():
             parsed_txns,
             region=region,
             min_amount=min_amount,
-            max_amount=max_amount
+            max_amount=max_amount,
+            prevalidated=True,
+            precomputed=filter_info
         )
         print(f"✓ Valid: {len(valid_txns)} | Invalid: {invalid_count}\n")
 
+        # ----------------------------------------
+        # Build DataFrames once for vectorized analysis (the Amount
+        # column is carried over from the Transactions arrays)
+        # ----------------------------------------
+        df_valid = valid_txns.to_frame()
+        df_parsed = parsed_txns.to_frame()
+
         # ----------------------------------------
         # WRITE DISCARDED SUMMARY AT TOP OF FILE
         # ----------------------------------------
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(output_file, "a", encoding="utf-8") as f:
-            f.write("=" * 60 + "\n")
-            f.write(f"{timestamp}\n")
-            f.write(f"Read-level discarded: {discarded_read}\n")
-            f.write(f"Cleaning-level discarded: {discarded_clean}\n")
-            f.write(f"Validation-level invalid: {invalid_count}\n\n")
-
-            f.write("Discarded Records:\n")
-            for rec in discarded_records:
-                f.write(rec + "\n")
-            f.write("\n")
+        out_f.write("=" * 60 + "\n")
+        out_f.write(f"{timestamp}\n")
+        out_f.write(f"Read-level discarded: {discarded_read}\n")
+        out_f.write(f"Cleaning-level discarded: {discarded_clean}\n")
+        out_f.write(f"Validation-level invalid: {invalid_count}\n\n")
+
+        out_f.write("Discarded Records:\n")
+        for rec in discarded_records:
+            out_f.write(rec + "\n")
+        out_f.write("\n")
 
         # ----------------------------------------
         # [5/10] Analyzing sales data
         # ----------------------------------------
         print("[5/10] Analyzing sales data...")
 
-        with open(output_file, "a", encoding="utf-8") as f:
-            original_stdout = sys.stdout
-            sys.stdout = Tee(f)
+        # Start the API request in the background so the network
+        # round-trip overlaps with the analysis stage
+        executor = ThreadPoolExecutor(max_workers=1)
+        api_future = executor.submit(request_products)
+
+        # ----------------------------------------
+        # Analysis cache: keyed by input fingerprint + filter params,
+        # so unchanged reruns load the results instead of recomputing
+        # ----------------------------------------
+        filter_key = hashlib.blake2b(
+            repr((region, min_amount, max_amount)).encode("utf-8")
+        ).hexdigest()[:8]
+        cache_dir = output_dir / ".cache"
+        cache_file = cache_dir / f"{fingerprint}-{filter_key}.pkl"
+
+        stats = None
+        if cache_file.exists():
+            try:
+                with open(cache_file, "rb") as cf:
+                    stats = pickle.load(cf)
+                if not isinstance(stats, SalesStats):
+                    stats = None  # stale cache from an older format
+            except Exception:
+                stats = None  # corrupt cache entry: recompute
+
+        if stats is None:
+            # Compute every analysis result in a single fused pass
+            stats = compute_all_stats(df_valid, full_df=df_parsed)
+            cache_dir.mkdir(exist_ok=True)
+            with open(cache_file, "wb") as cf:
+                pickle.dump(stats, cf)
+        total_revenue = stats.total_revenue
+        region_stats = stats.region_stats
+        top_products = stats.top_products
+        peak_day = stats.peak_day
+
+        # buffer the analysis prints in memory, then write them to the
+        # output file in one go (no per-print file writes or flushes)
+        analysis_buf = io.StringIO()
+        original_stdout = sys.stdout
+        try:
+            sys.stdout = analysis_buf
 
             print("=" * 60)
             print("SALES ANALYSIS RESULTS")
             print("=" * 60)
 
-            total_revenue = calculate_total_revenue(valid_txns)
             print("Total Revenue:")
             print(total_revenue)
             print()
 
             print("Region-wise Sales:")
-            region_stats = region_wise_sales(parsed_txns)
             print(region_stats)
             print()
 
             print("Top Selling Products:")
-            top_products = top_selling_products(valid_txns)
             print(top_products)
             print()
 
             print("Peak Sales Day:")
-            peak_day = find_peak_sales_day(parsed_txns)
             print(peak_day)
             print()
 
             print("Low Performing Products:")
-            print(low_performing_products(valid_txns))
+            print(stats.low_products)
             print()
 
             print("Customer Analysis:")
-            print(customer_analysis(valid_txns))
+            print(stats.customer_stats)
             print()
 
             print("Daily Sales Trend:")
-            print(daily_sales_trend(parsed_txns))
+            print(stats.daily_trend)
             print()
-
+        finally:
             sys.stdout = original_stdout
 
+        out_f.write(analysis_buf.getvalue())
+        out_f.close()
+        out_f = None
+
         print("✓ Analysis complete\n")
 
         # ----------------------------------------
         # [6/10] Fetching product data from API
         # ----------------------------------------
         print("[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
+        api_products = fetch_all_products(prefetched=api_future)
+        executor.shutdown()
         print(f"✓ Fetched {len(api_products)} products\n")
 
         # ----------------------------------------
@@ -181,9 +216,9 @@ def main():
         # ----------------------------------------
         print("[7/10] Enriching sales data...")
         product_mapping = create_product_mapping(api_products)
-        enriched_txns = enrich_sales_data(valid_txns, product_mapping)
+        enriched_txns = enrich_sales_data(df_valid, product_mapping)
 
-        matched = sum(1 for t in enriched_txns if t.get("API_Match"))
+        matched = int(enriched_txns["API_Match"].sum())
         total = len(valid_txns)
         percent = (matched / total * 100) if total else 0
 
@@ -201,50 +236,49 @@ def main():
         # ----------------------------------------
         print("[9/10] Generating report...")
 
+        # assemble the whole report body, then write it in one call
+        region_lines = "".join(
+            f"{region_name}: ₹{stats['total_sales']} | "
+            f"Transactions: {stats['transaction_count']} | "
+            f"Contribution: {stats['percentage']}%\n"
+            for region_name, stats in region_stats.items()
+        )
+        product_lines = "".join(
+            f"{product} | Qty: {qty} | Revenue: ₹{revenue}\n"
+            for product, qty, revenue in top_products
+        )
+
+        report_body = (
+            f"{'=' * 60}\n"
+            "SALES ANALYTICS REPORT\n"
+            f"{'=' * 60}\n\n"
+            "VALIDATION SUMMARY\n"
+            f"{'-' * 40}\n"
+            f"Valid Transactions   : {len(valid_txns)}\n"
+            f"Invalid Transactions : {invalid_count}\n\n"
+            "REVENUE SUMMARY\n"
+            f"{'-' * 40}\n"
+            f"Total Revenue : ₹{total_revenue}\n\n"
+            "REGION-WISE SALES\n"
+            f"{'-' * 40}\n"
+            f"{region_lines}\n"
+            "TOP SELLING PRODUCTS\n"
+            f"{'-' * 40}\n"
+            f"{product_lines}\n"
+            "PEAK SALES DAY\n"
+            f"{'-' * 40}\n"
+            f"Date: {peak_day[0]} | "
+            f"Revenue: ₹{peak_day[1]} | "
+            f"Transactions: {peak_day[2]}\n\n"
+            "API ENRICHMENT SUMMARY\n"
+            f"{'-' * 40}\n"
+            f"Matched Transactions : {matched}\n"
+            f"Total Transactions   : {total}\n"
+            f"Coverage             : {percent:.1f}%\n"
+        )
+
         report_file = base_dir / "output" / "sales_report.txt"
-        with open(report_file, "w", encoding="utf-8") as f:
-            f.write("=" * 60 + "\n")
-            f.write("SALES ANALYTICS REPORT\n")
-            f.write("=" * 60 + "\n\n")
-
-            f.write("VALIDATION SUMMARY\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"Valid Transactions   : {len(valid_txns)}\n")
-            f.write(f"Invalid Transactions : {invalid_count}\n\n")
-
-            f.write("REVENUE SUMMARY\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"Total Revenue : ₹{total_revenue}\n\n")
-
-            f.write("REGION-WISE SALES\n")
-            f.write("-" * 40 + "\n")
-            for region, stats in region_stats.items():
-                f.write(
-                    f"{region}: ₹{stats['total_sales']} | "
-                    f"Transactions: {stats['transaction_count']} | "
-                    f"Contribution: {stats['percentage']}%\n"
-                )
-            f.write("\n")
-
-            f.write("TOP SELLING PRODUCTS\n")
-            f.write("-" * 40 + "\n")
-            for product, qty, revenue in top_products:
-                f.write(f"{product} | Qty: {qty} | Revenue: ₹{revenue}\n")
-            f.write("\n")
-
-            f.write("PEAK SALES DAY\n")
-            f.write("-" * 40 + "\n")
-            f.write(
-                f"Date: {peak_day[0]} | "
-                f"Revenue: ₹{peak_day[1]} | "
-                f"Transactions: {peak_day[2]}\n\n"
-            )
-
-            f.write("API ENRICHMENT SUMMARY\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"Matched Transactions : {matched}\n")
-            f.write(f"Total Transactions   : {total}\n")
-            f.write(f"Coverage             : {percent:.1f}%\n")
+        report_file.write_text(report_body, encoding="utf-8")
 
         print("✓ Report saved to: output/sales_report.txt\n")
 
@@ -252,6 +286,10 @@ def main():
         print("An error occurred during execution")
         print(f"Reason: {e}")
 
+    finally:
+        if out_f is not None:
+            out_f.close()
+
 
 if __name__ == "__main__":
     main()
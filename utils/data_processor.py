@@ -1,16 +1,30 @@
-def calculate_total_revenue(transactions):
-    total_revenue = 0.0
+from dataclasses import dataclass
 
-    for txn in transactions:
-        try:
-            total_revenue += txn["Quantity"] * txn["UnitPrice"]
-        except (KeyError, TypeError):
-            # Skip malformed transaction records safely
-            continue
+import numpy as np
+import pandas as pd
 
-    return round(total_revenue, 2)
+from utils.fast_agg import agg_valid_txns, agg_full_txns
 
-def region_wise_sales(transactions):
+
+@dataclass
+class SalesStats:
+    """Bundle of every analysis result from one compute_all_stats run"""
+    total_revenue: float
+    region_stats: dict
+    top_products: list
+    low_products: list
+    customer_stats: dict
+    daily_trend: dict
+    peak_day: tuple
+
+
+def calculate_total_revenue(df):
+    if df.empty:
+        return 0.0
+
+    return round(float(df["Amount"].sum()), 2)
+
+def region_wise_sales(df):
     """
     Analyzes sales by region
 
@@ -27,63 +41,62 @@ def region_wise_sales(transactions):
     }
     """
 
-    region_stats = {}
-    total_sales_all_regions = 0.0
+    if df.empty:
+        return {}
 
     # ----------------------------------------
-    # Aggregate sales and counts per region
+    # Aggregate sales and counts per region (vectorized)
     # ----------------------------------------
-    for txn in transactions:
-        try:
-            region = txn["Region"]
-            amount = txn["Quantity"] * txn["UnitPrice"]
-
-            if region not in region_stats:
-                region_stats[region] = {
-                    "total_sales": 0.0,
-                    "transaction_count": 0
-                }
-
-            region_stats[region]["total_sales"] += amount
-            region_stats[region]["transaction_count"] += 1
-            total_sales_all_regions += amount
-
-        except (KeyError, TypeError):
-            # Skip malformed records safely
-            continue
+    grouped = df.groupby("Region", sort=False)["Amount"].agg(["sum", "count"])
+    total_sales_all_regions = grouped["sum"].sum()
 
     # ----------------------------------------
     # Calculate percentage contribution
     # ----------------------------------------
-    for region in region_stats:
-        if total_sales_all_regions > 0:
-            percentage = (
-                region_stats[region]["total_sales"] / total_sales_all_regions
-            ) * 100
-        else:
-            percentage = 0.0
-
-        region_stats[region]["percentage"] = round(percentage, 2)
-
-        # Round total sales to 2 decimals for consistency
-        region_stats[region]["total_sales"] = round(
-            region_stats[region]["total_sales"], 2
-        )
+    if total_sales_all_regions > 0:
+        percentages = (grouped["sum"] / total_sales_all_regions) * 100
+    else:
+        percentages = grouped["sum"] * 0.0
 
     # ----------------------------------------
     # Sort by total_sales (descending)
     # ----------------------------------------
-    sorted_region_stats = dict(
-        sorted(
-            region_stats.items(),
-            key=lambda item: item[1]["total_sales"],
-            reverse=True
-        )
+    grouped = grouped.sort_values("sum", ascending=False, kind="stable")
+
+    # one vectorized rounding pass at the output boundary
+    grouped["sum"] = grouped["sum"].round(2)
+    percentages = percentages.round(2)
+
+    return {
+        region: {
+            "total_sales": float(row["sum"]),
+            "transaction_count": int(row["count"]),
+            "percentage": float(percentages[region])
+        }
+        for region, row in grouped.iterrows()
+    }
+
+def _group_products(df):
+    """Aggregates quantity and revenue per product (shared by top/low)"""
+    return df.groupby("ProductName", sort=False).agg(
+        total_quantity=("Quantity", "sum"),
+        total_revenue=("Amount", "sum")
     )
 
-    return sorted_region_stats
+def _top_products(grouped, n):
+    # ----------------------------------------
+    # Top n by quantity: nlargest selects without a full sort, and
+    # keep="first" preserves the first-seen ordering for ties
+    # ----------------------------------------
+    top = grouped.nlargest(n, "total_quantity", keep="first")
+    top["total_revenue"] = top["total_revenue"].round(2)
 
-def top_selling_products(transactions, n=5):
+    return [
+        (product, int(row["total_quantity"]), float(row["total_revenue"]))
+        for product, row in top.iterrows()
+    ]
+
+def top_selling_products(df, n=5):
     """
     Finds top n products by total quantity sold
 
@@ -97,53 +110,12 @@ def top_selling_products(transactions, n=5):
     ]
     """
 
-    product_stats = {}
-
-    # ----------------------------------------
-    # Aggregate quantity and revenue per product
-    # ----------------------------------------
-    for txn in transactions:
-        try:
-            product_name = txn["ProductName"]
-            quantity = txn["Quantity"]
-            revenue = quantity * txn["UnitPrice"]
-
-            if product_name not in product_stats:
-                product_stats[product_name] = {
-                    "total_quantity": 0,
-                    "total_revenue": 0.0
-                }
+    if df.empty:
+        return []
 
-            product_stats[product_name]["total_quantity"] += quantity
-            product_stats[product_name]["total_revenue"] += revenue
+    return _top_products(_group_products(df), n)
 
-        except (KeyError, TypeError):
-            # Skip malformed records safely
-            continue
-
-    # ----------------------------------------
-    # Convert to list of tuples
-    # ----------------------------------------
-    product_list = [
-        (
-            product,
-            stats["total_quantity"],
-            round(stats["total_revenue"], 2)
-        )
-        for product, stats in product_stats.items()
-    ]
-
-    # ----------------------------------------
-    # Sort by total quantity sold (descending)
-    # ----------------------------------------
-    product_list.sort(key=lambda x: x[1], reverse=True)
-
-    # ----------------------------------------
-    # Return top n products
-    # ----------------------------------------
-    return product_list[:n]
-
-def customer_analysis(transactions):
+def customer_analysis(df):
     """
     Analyzes customer purchase patterns
 
@@ -161,185 +133,281 @@ def customer_analysis(transactions):
     }
     """
 
-    customer_stats = {}
-
-    # ----------------------------------------
-    # Aggregate customer data
-    # ----------------------------------------
-    for txn in transactions:
-        try:
-            customer_id = txn["CustomerID"]
-            product = txn["ProductName"]
-            amount = txn["Quantity"] * txn["UnitPrice"]
-
-            if customer_id not in customer_stats:
-                customer_stats[customer_id] = {
-                    "total_spent": 0.0,
-                    "purchase_count": 0,
-                    "products_bought": set()
-                }
-
-            customer_stats[customer_id]["total_spent"] += amount
-            customer_stats[customer_id]["purchase_count"] += 1
-            customer_stats[customer_id]["products_bought"].add(product)
-
-        except (KeyError, TypeError):
-            # Skip malformed records safely
-            continue
+    if df.empty:
+        return {}
 
     # ----------------------------------------
-    # Final calculations per customer
+    # Aggregate customer data (vectorized)
     # ----------------------------------------
-    for customer_id, stats in customer_stats.items():
-        count = stats["purchase_count"]
-        stats["avg_order_value"] = (
-            round(stats["total_spent"] / count, 2) if count > 0 else 0.0
-        )
-
-        stats["total_spent"] = round(stats["total_spent"], 2)
-        stats["products_bought"] = sorted(stats["products_bought"])
+    grouped = df.groupby("CustomerID", sort=False).agg(
+        total_spent=("Amount", "sum"),
+        purchase_count=("TransactionID", "count"),
+        products_bought=("ProductName", lambda s: sorted(set(s)))
+    )
 
     # ----------------------------------------
     # Sort by total_spent (descending)
     # ----------------------------------------
-    sorted_customers = dict(
-        sorted(
-            customer_stats.items(),
-            key=lambda item: item[1]["total_spent"],
-            reverse=True
-        )
+    grouped = grouped.sort_values("total_spent", ascending=False, kind="stable")
+
+    # one vectorized rounding pass at the output boundary
+    grouped["avg_order_value"] = (
+        grouped["total_spent"] / grouped["purchase_count"]
+    ).round(2)
+    grouped["total_spent"] = grouped["total_spent"].round(2)
+
+    return {
+        customer_id: {
+            "total_spent": float(row["total_spent"]),
+            "purchase_count": int(row["purchase_count"]),
+            "products_bought": row["products_bought"],
+            "avg_order_value": float(row["avg_order_value"])
+        }
+        for customer_id, row in grouped.iterrows()
+    }
+
+def _group_daily(df):
+    """Aggregates per-date data (shared by trend/peak), sorted chronologically"""
+    return df.groupby("Date").agg(
+        revenue=("Amount", "sum"),
+        transaction_count=("Amount", "count"),
+        unique_customers=("CustomerID", "nunique")
     )
 
-    return sorted_customers
+def _daily_trend(grouped):
+    grouped = grouped.assign(revenue=grouped["revenue"].round(2))
+    return {
+        date: {
+            "revenue": float(row["revenue"]),
+            "transaction_count": int(row["transaction_count"]),
+            "unique_customers": int(row["unique_customers"])
+        }
+        for date, row in grouped.iterrows()
+    }
 
-def daily_sales_trend(transactions):
+def daily_sales_trend(df):
 
-    daily_stats = {}
+    if df.empty:
+        return {}
 
-    # ----------------------------------------
-    # Aggregate data per date
-    # ----------------------------------------
-    for txn in transactions:
-        try:
-            date = txn["Date"]
-            customer_id = txn["CustomerID"]
-            amount = txn["Quantity"] * txn["UnitPrice"]
-
-            if date not in daily_stats:
-                daily_stats[date] = {
-                    "revenue": 0.0,
-                    "transaction_count": 0,
-                    "unique_customers": set()
-                }
-
-            daily_stats[date]["revenue"] += amount
-            daily_stats[date]["transaction_count"] += 1
-            daily_stats[date]["unique_customers"].add(customer_id)
-
-        except (KeyError, TypeError):
-            # Skip malformed records safely
-            continue
+    return _daily_trend(_group_daily(df))
 
+def _peak_day(grouped):
     # ----------------------------------------
-    # Finalize daily statistics
+    # Identify peak sales day (single argmax over the revenue array)
     # ----------------------------------------
-    for date, stats in daily_stats.items():
-        stats["revenue"] = round(stats["revenue"], 2)
-        stats["unique_customers"] = len(stats["unique_customers"])
+    revenue = grouped["revenue"].to_numpy()
+    peak = int(revenue.argmax())
 
-    # ----------------------------------------
-    # Sort chronologically by date
-    # ----------------------------------------
-    sorted_daily_stats = dict(sorted(daily_stats.items()))
+    return (
+        grouped.index[peak],
+        round(float(revenue[peak]), 2),  # single scalar, rounded for display
+        int(grouped["transaction_count"].to_numpy()[peak])
+    )
+
+def find_peak_sales_day(df):
 
-    return sorted_daily_stats
+    if df.empty:
+        return (None, 0.0, 0)
 
-def find_peak_sales_day(transactions):
-   
-    daily_totals = {}
+    return _peak_day(_group_daily(df))
 
+def _low_products(grouped, threshold):
     # ----------------------------------------
-    # Aggregate revenue and count per date
+    # Filter low-performing products, sort by quantity ascending
     # ----------------------------------------
-    for txn in transactions:
-        try:
-            date = txn["Date"]
-            amount = txn["Quantity"] * txn["UnitPrice"]
+    grouped = grouped[grouped["total_quantity"] < threshold]
+    grouped = grouped.sort_values("total_quantity", kind="stable")
 
-            if date not in daily_totals:
-                daily_totals[date] = {
-                    "revenue": 0.0,
-                    "transaction_count": 0
-                }
+    return [
+        (product, int(row["total_quantity"]), round(float(row["total_revenue"]), 2))
+        for product, row in grouped.iterrows()
+    ]
 
-            daily_totals[date]["revenue"] += amount
-            daily_totals[date]["transaction_count"] += 1
+def low_performing_products(df, threshold=10):
 
-        except (KeyError, TypeError):
-            # Skip malformed records safely
-            continue
+    if df.empty:
+        return []
 
-    # ----------------------------------------
-    # Identify peak sales day
-    # ----------------------------------------
-    peak_date = None
-    peak_revenue = 0.0
-    peak_txn_count = 0
+    return _low_products(_group_products(df), threshold)
 
-    for date, stats in daily_totals.items():
-        if stats["revenue"] > peak_revenue:
-            peak_date = date
-            peak_revenue = stats["revenue"]
-            peak_txn_count = stats["transaction_count"]
+def compute_all_stats(df, full_df=None, n=5, threshold=10):
+    """
+    Computes every analysis result in one fused pass over the data
 
-    return (
-        peak_date,
-        round(peak_revenue, 2),
-        peak_txn_count
-    )
+    Label-encodes the grouping columns into int64 codes
+    (pd.factorize), runs the JIT-compiled single-pass kernels from
+    fast_agg over the numeric arrays, then decodes the per-group
+    results back into the usual output structures.
+
+    df      : validated/filtered transactions
+    full_df : all parsed transactions (used for region/daily analysis);
+              defaults to df
 
-def low_performing_products(transactions, threshold=10):
-    
-    product_stats = {}
+    Returns: SalesStats with all seven analysis results
+    """
+
+    if full_df is None:
+        full_df = df
 
     # ----------------------------------------
-    # Aggregate quantity and revenue per product
+    # Valid transactions: revenue, products, customers
     # ----------------------------------------
-    for txn in transactions:
-        try:
-            product = txn["ProductName"]
-            quantity = txn["Quantity"]
-            revenue = quantity * txn["UnitPrice"]
-
-            if product not in product_stats:
-                product_stats[product] = {
-                    "total_quantity": 0,
-                    "total_revenue": 0.0
-                }
+    if df.empty:
+        total_revenue = 0.0
+        top_products = []
+        low_products = []
+        customer_stats = {}
+    else:
+        amounts = df["Amount"].to_numpy()
+        quantity = df["Quantity"].to_numpy()
+        product_codes, product_labels = pd.factorize(df["ProductName"])
+        customer_codes, customer_labels = pd.factorize(df["CustomerID"])
 
-            product_stats[product]["total_quantity"] += quantity
-            product_stats[product]["total_revenue"] += revenue
+        product_qty = np.zeros(len(product_labels), dtype=np.int64)
+        product_rev = np.zeros(len(product_labels), dtype=np.float64)
+        customer_sum = np.zeros(len(customer_labels), dtype=np.float64)
+        customer_cnt = np.zeros(len(customer_labels), dtype=np.int64)
 
-        except (KeyError, TypeError):
-            # Skip malformed records safely
-            continue
+        total = agg_valid_txns(
+            quantity, amounts, product_codes, customer_codes,
+            product_qty, product_rev, customer_sum, customer_cnt
+        )
+        total_revenue = round(float(total), 2)
+
+        # aggregation stays in raw float64; rounding happens once per
+        # result array here at the output boundary
+        avg_order_value = np.round(
+            np.divide(customer_sum, customer_cnt,
+                      out=np.zeros_like(customer_sum),
+                      where=customer_cnt > 0),
+            2
+        )
+        product_rev = np.round(product_rev, 2)
+        customer_sum = np.round(customer_sum, 2)
+
+        # top n via argpartition: composite keys make the order strict
+        # (quantity desc, then first-seen), so the partial selection
+        # matches what a full stable sort would return
+        n_products = len(product_labels)
+        keys = product_qty * n_products + (n_products - 1 - np.arange(n_products))
+        if n < n_products:
+            candidates = np.argpartition(-keys, n - 1)[:n]
+        else:
+            candidates = np.arange(n_products)
+        top_order = candidates[np.argsort(-keys[candidates])]
+        top_products = [
+            (product_labels[i], int(product_qty[i]), float(product_rev[i]))
+            for i in top_order
+        ]
+
+        # low performers: filter the (usually small) subset first,
+        # then stable-sort only those rows
+        low_idx = np.nonzero(product_qty < threshold)[0]
+        low_order = low_idx[np.argsort(product_qty[low_idx], kind="stable")]
+        low_products = [
+            (product_labels[i], int(product_qty[i]), float(product_rev[i]))
+            for i in low_order
+        ]
+
+        # distinct (customer, product) pairs via code dedup; the tiny
+        # deduplicated result is then decoded back to sorted name lists
+        pairs = np.unique(
+            np.stack([customer_codes, product_codes], axis=1), axis=0
+        )
+        products_by_customer = [[] for _ in range(len(customer_labels))]
+        for cust, prod in pairs:
+            products_by_customer[cust].append(product_labels[prod])
+        for bought in products_by_customer:
+            bought.sort()
+
+        customer_order = np.argsort(-customer_sum, kind="stable")
+        customer_stats = {
+            customer_labels[i]: {
+                "total_spent": float(customer_sum[i]),
+                "purchase_count": int(customer_cnt[i]),
+                "products_bought": products_by_customer[i],
+                "avg_order_value": float(avg_order_value[i])
+            }
+            for i in customer_order
+        }
+
+    # ----------------------------------------
+    # All parsed transactions: regions, daily trend, peak day
+    # ----------------------------------------
+    if full_df.empty:
+        region_stats = {}
+        daily_trend = {}
+        peak_day = (None, 0.0, 0)
+    else:
+        full_amounts = full_df["Amount"].to_numpy()
+        region_codes, region_labels = pd.factorize(full_df["Region"])
+        date_codes, date_labels = pd.factorize(full_df["Date"])
+
+        region_sum = np.zeros(len(region_labels), dtype=np.float64)
+        region_cnt = np.zeros(len(region_labels), dtype=np.int64)
+        daily_rev = np.zeros(len(date_labels), dtype=np.float64)
+        daily_cnt = np.zeros(len(date_labels), dtype=np.int64)
+
+        agg_full_txns(
+            full_amounts, region_codes, date_codes,
+            region_sum, region_cnt, daily_rev, daily_cnt
+        )
 
-    # ----------------------------------------
-    # Filter low-performing products
-    # ----------------------------------------
-    low_products = [
-        (
-            product,
-            stats["total_quantity"],
-            round(stats["total_revenue"], 2)
+        total_all_regions = region_sum.sum()
+        if total_all_regions > 0:
+            percentages = np.round(region_sum / total_all_regions * 100, 2)
+        else:
+            percentages = np.zeros_like(region_sum)
+        region_sum = np.round(region_sum, 2)
+
+        region_order = np.argsort(-region_sum, kind="stable")
+        region_stats = {
+            region_labels[i]: {
+                "total_sales": float(region_sum[i]),
+                "transaction_count": int(region_cnt[i]),
+                "percentage": float(percentages[i])
+            }
+            for i in region_order
+        }
+
+        # unique customers per day: dedup (date, customer) code pairs,
+        # then count the surviving pairs per date with bincount
+        full_customer_codes, _ = pd.factorize(full_df["CustomerID"])
+        day_customer_pairs = np.unique(
+            np.stack([date_codes, full_customer_codes], axis=1), axis=0
+        )
+        customers_per_day = np.bincount(
+            day_customer_pairs[:, 0], minlength=len(date_labels)
         )
-        for product, stats in product_stats.items()
-        if stats["total_quantity"] < threshold
-    ]
 
-    # ----------------------------------------
-    # Sort by total quantity ascending
-    # ----------------------------------------
-    low_products.sort(key=lambda x: x[1])
+        # peak comes from the raw revenue array; rounding afterwards is
+        # a single vectorized pass for the trend output
+        peak = int(daily_rev.argmax())
+        daily_rev = np.round(daily_rev, 2)
+
+        date_order = np.argsort(date_labels)
+        daily_trend = {
+            date_labels[i]: {
+                "revenue": float(daily_rev[i]),
+                "transaction_count": int(daily_cnt[i]),
+                "unique_customers": int(customers_per_day[i])
+            }
+            for i in date_order
+        }
+
+        peak_day = (
+            date_labels[peak],
+            float(daily_rev[peak]),
+            int(daily_cnt[peak])
+        )
 
-    return low_products
+    return SalesStats(
+        total_revenue=total_revenue,
+        region_stats=region_stats,
+        top_products=top_products,
+        low_products=low_products,
+        customer_stats=customer_stats,
+        daily_trend=daily_trend,
+        peak_day=peak_day,
+    )
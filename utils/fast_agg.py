@@ -0,0 +1,113 @@
+import numpy as np
+
+# JIT-compiled aggregation kernels (falls back to pure Python if numba
+# is not installed, mirroring the encoding-fallback style elsewhere)
+try:
+    from numba import njit, prange, get_num_threads
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+    def prange(n):
+        return range(n)
+
+    def get_num_threads():
+        return 1
+
+
+@njit(cache=True, fastmath=True)
+def agg_valid_txns(quantity, amounts, product_codes, customer_codes,
+                   product_qty, product_rev, customer_sum, customer_cnt):
+    """
+    Fused single-pass aggregation over validated transactions
+
+    Accumulates per-product quantity/revenue and per-customer
+    spend/count into the preallocated output arrays, and returns the
+    total revenue. Group keys arrive label-encoded as int64 codes so
+    the loop compiles to tight native code with no string hashing.
+    """
+    total = 0.0
+    for i in range(amounts.shape[0]):
+        amt = amounts[i]
+        total += amt
+
+        p = product_codes[i]
+        product_qty[p] += quantity[i]
+        product_rev[p] += amt
+
+        c = customer_codes[i]
+        customer_sum[c] += amt
+        customer_cnt[c] += 1
+
+    return total
+
+
+@njit(cache=True, fastmath=True)
+def agg_full_txns(amounts, region_codes, date_codes,
+                  region_sum, region_cnt, daily_rev, daily_cnt):
+    """
+    Fused single-pass aggregation over all parsed transactions
+
+    Accumulates per-region sales/count and per-date revenue/count into
+    the preallocated output arrays.
+    """
+    for i in range(amounts.shape[0]):
+        amt = amounts[i]
+
+        r = region_codes[i]
+        region_sum[r] += amt
+        region_cnt[r] += 1
+
+        d = date_codes[i]
+        daily_rev[d] += amt
+        daily_cnt[d] += 1
+
+
+@njit(cache=True)
+def groupby_sum_count(codes, values, n_groups):
+    """
+    Per-group sum and count over label-encoded keys
+
+    codes: int64 group codes in [0, n_groups); values: float64.
+    Returns (sums, counts) arrays of length n_groups.
+    """
+    sums = np.zeros(n_groups, dtype=np.float64)
+    counts = np.zeros(n_groups, dtype=np.int64)
+    for i in range(codes.shape[0]):
+        c = codes[i]
+        sums[c] += values[i]
+        counts[c] += 1
+    return sums, counts
+
+
+# no cache=True here: numba cannot cache parallel kernels that use
+# dynamic thread state, and warns if asked to
+@njit(parallel=True)
+def groupby_sum_count_parallel(codes, values, n_groups):
+    """
+    Parallel variant of groupby_sum_count for large inputs
+
+    Each thread accumulates a contiguous chunk into its own partial
+    arrays (no atomics), which are reduced at the end.
+    """
+    n = codes.shape[0]
+    n_threads = get_num_threads()
+    chunk = (n + n_threads - 1) // n_threads
+
+    partial_sums = np.zeros((n_threads, n_groups), dtype=np.float64)
+    partial_counts = np.zeros((n_threads, n_groups), dtype=np.int64)
+
+    for t in prange(n_threads):
+        start = t * chunk
+        end = min(start + chunk, n)
+        for i in range(start, end):
+            c = codes[i]
+            partial_sums[t, c] += values[i]
+            partial_counts[t, c] += 1
+
+    return partial_sums.sum(axis=0), partial_counts.sum(axis=0)
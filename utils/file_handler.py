@@ -1,7 +1,100 @@
 # import libraries
+import hashlib
+import mmap
+import re
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
+
+# one compiled pattern fuses the 8-field split, per-field stripping and
+# the full set of format rules (T/P/C-prefixed ids, numeric
+# quantity/price, non-empty region) into a single C-level match per
+# line, so validate_and_filter never needs to re-check parser output
+_TXN_RE = re.compile(
+    r"\s*(T[^|]*?)\s*\|"        # TransactionID (must start with T)
+    r"\s*([^|]*?)\s*\|"         # Date
+    r"\s*(P[^|]*?)\s*\|"        # ProductID (must start with P)
+    r"\s*([^|]*?)\s*\|"         # ProductName
+    r"\s*([\d,]+)\s*\|"         # Quantity (non-negative integer)
+    r"\s*([\d,]*\.?\d+)\s*\|"   # UnitPrice (non-negative number)
+    r"\s*(C[^|]*?)\s*\|"        # CustomerID (must start with C)
+    r"\s*([^|\s][^|]*?)\s*$"    # Region (non-empty)
+)
+
+
+class Transactions:
+    """
+    Columnar (structure-of-arrays) container for parsed transactions
+
+    Each field is stored as one NumPy array instead of one dict per
+    row, so numeric columns are contiguous int64/float64 memory and
+    amounts can be computed with a single vectorized multiply.
+    """
+
+    def __init__(self, transaction_id, date, product_id, product_name,
+                 quantity, unit_price, customer_id, region):
+        self.transaction_id = transaction_id
+        self.date = date
+        self.product_id = product_id
+        self.product_name = product_name
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.customer_id = customer_id
+        self.region = region
+        # computed once here; every later consumer reads this array
+        self.amount = quantity * unit_price
+
+    def __len__(self):
+        return self.quantity.size
+
+    def select(self, mask):
+        """Returns a new Transactions with only the rows where mask is True"""
+        return Transactions(
+            self.transaction_id[mask],
+            self.date[mask],
+            self.product_id[mask],
+            self.product_name[mask],
+            self.quantity[mask],
+            self.unit_price[mask],
+            self.customer_id[mask],
+            self.region[mask]
+        )
+
+    def to_frame(self):
+        """Builds a DataFrame view over the column arrays (no row dicts)"""
+        return pd.DataFrame({
+            "TransactionID": self.transaction_id,
+            "Date": self.date,
+            "ProductID": self.product_id,
+            "ProductName": self.product_name,
+            "Quantity": self.quantity,
+            "UnitPrice": self.unit_price,
+            "CustomerID": self.customer_id,
+            "Region": self.region,
+            "Amount": self.amount
+        })
+
+    def iter_rows(self):
+        """Yields one dictionary per transaction (row-oriented consumers)"""
+        for tid, date, pid, pname, qty, price, cid, reg in zip(
+            self.transaction_id, self.date, self.product_id,
+            self.product_name, self.quantity, self.unit_price,
+            self.customer_id, self.region
+        ):
+            yield {
+                "TransactionID": tid,
+                "Date": date,
+                "ProductID": pid,
+                "ProductName": pname,
+                "Quantity": int(qty),
+                "UnitPrice": float(price),
+                "CustomerID": cid,
+                "Region": reg
+            }
+
 
 def read_sales_data(filename):
 
@@ -11,38 +104,53 @@ def read_sales_data(filename):
 
     encodings = ["utf-8", "latin-1", "cp1252"]
 
+    # memory-map the file instead of readlines(): the kernel pages the
+    # bytes in directly and we decode the buffer in a single C call
+    try:
+        with open(data_path, "rb") as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty file cannot be mapped
+                buffer = b""
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Sales data not found: {data_path}")
+
+    # content fingerprint: lets callers cache derived results and skip
+    # recomputation when the input file has not changed
+    fingerprint = hashlib.blake2b(bytes(buffer)).hexdigest()[:16]
+
+    # detect a UTF-8 BOM so the header line decodes cleanly
+    if buffer[:3] == b"\xef\xbb\xbf":
+        encodings = ["utf-8-sig"] + encodings
+
     for encoding in encodings:
         try:
-            # read entire file
-            with open(data_path, "r", encoding=encoding) as file:
-                raw_lines = file.readlines()
-
-            total_lines = len(raw_lines)
-
-            # skip header and remove empty lines
-            lines = [
-                line.strip()
-                for line in raw_lines[1:]
-                if line.strip()
-            ]
+            text = str(buffer, encoding)
+        except UnicodeDecodeError:
+            continue
 
-            # header + empty lines removed
-            discarded = total_lines - 1 - len(lines)
+        raw_lines = text.splitlines()
+        total_lines = len(raw_lines)
 
-            return lines, discarded
+        # skip header and remove empty lines
+        lines = [
+            line.strip()
+            for line in raw_lines[1:]
+            if line.strip()
+        ]
 
-        except UnicodeDecodeError:
-            continue
+        # header + empty lines removed
+        discarded = total_lines - 1 - len(lines)
 
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Sales data not found: {data_path}")
+        return lines, discarded, fingerprint
 
     raise ValueError("Unable to read file with supported encodings")
 
 
 # ---------------- TEST + LOGGING ----------------
 if __name__ == "__main__":
-    result, discarded = read_sales_data("sales_data.txt")
+    result, discarded, _ = read_sales_data("sales_data.txt")
 
     print(f"Transactions read: {len(result)}")
     print(f"Transactions discarded: {discarded}")
@@ -62,122 +170,175 @@ if __name__ == "__main__":
             f"Transactions read: {len(result)} | "
             f"Discarded: {discarded}\n"
         )
-def parse_transactions(raw_lines):
+def iter_transactions(raw_lines, discarded_records=None, tallies=None):
     """
-    Parses raw lines into clean list of dictionaries
-    Removes invalid records as per data cleaning criteria
+    Streams valid parsed rows one at a time as field tuples
 
-    Returns:
-    - parsed_transactions
-    - discarded_count
-    - discarded_records (raw lines)
+    Yields (transaction_id, date, product_id, product_name, quantity,
+    unit_price, customer_id, region) per accepted line, so consumers
+    never hold more than one row of intermediate state.
+
+    discarded_records: optional list collecting rejected raw lines
+    tallies: optional dict updated with "total"/"discarded" counts
     """
 
-    parsed_transactions = []
-    discarded_records = []
-    discarded_count = 0
-    total_records = 0
+    if discarded_records is None:
+        discarded_records = []
+    if tallies is None:
+        tallies = {}
+    tallies["total"] = 0
+    tallies["discarded"] = 0
 
     for line in raw_lines:
         line = line.strip()
         if not line:
             continue
 
-        total_records += 1
-        parts = line.split("|")
+        tallies["total"] += 1
 
-        if len(parts) != 8:
-            discarded_count += 1
+        # one regex match replaces split + per-field strip + format checks
+        match = _TXN_RE.match(line)
+        if match is None:
+            tallies["discarded"] += 1
             discarded_records.append(line)
             continue
 
         try:
-            transaction_id = parts[0].strip()
-            date = parts[1].strip()
-            product_id = parts[2].strip()
-            product_name = parts[3].replace(",", " ").strip()
-            quantity = int(parts[4].replace(",", "").strip())
-            unit_price = float(parts[5].replace(",", "").strip())
-            customer_id = parts[6].strip()
-            region = parts[7].strip()
-
-            # INVALID RULES
-            if not transaction_id.startswith("T"):
-                raise ValueError("Invalid TransactionID")
-            if not customer_id or not region:
-                raise ValueError("Missing CustomerID or Region")
+            (transaction_id, date, product_id, product_name,
+             quantity, unit_price, customer_id, region) = match.groups()
+
+            product_name = product_name.replace(",", " ").strip()
+            quantity = int(quantity.replace(",", ""))
+            unit_price = float(unit_price.replace(",", ""))
+
+            # INVALID RULES not expressible in the pattern
             if quantity <= 0:
                 raise ValueError("Invalid Quantity")
             if unit_price <= 0:
                 raise ValueError("Invalid UnitPrice")
 
-            parsed_transactions.append({
-                "TransactionID": transaction_id,
-                "Date": date,
-                "ProductID": product_id,
-                "ProductName": product_name,
-                "Quantity": quantity,
-                "UnitPrice": unit_price,
-                "CustomerID": customer_id,
-                "Region": region
-            })
-
         except Exception:
-            discarded_count += 1
+            tallies["discarded"] += 1
             discarded_records.append(line)
+            continue
+
+        yield (transaction_id, date, product_id, product_name,
+               quantity, unit_price, customer_id, region)
+
+def parse_transactions(raw_lines):
+    """
+    Parses raw lines into columnar Transactions arrays
+    Removes invalid records as per data cleaning criteria
+
+    Returns:
+    - parsed_transactions (Transactions, one NumPy array per field)
+    - discarded_count
+    - discarded_records (raw lines)
+    """
+
+    # per-column buffers (SoA layout), filled from the streaming
+    # iterator so no per-row containers are ever materialized
+    tid_col = []
+    date_col = []
+    pid_col = []
+    pname_col = []
+    qty_col = []
+    price_col = []
+    cid_col = []
+    region_col = []
+
+    discarded_records = []
+    tallies = {}
+
+    for (transaction_id, date, product_id, product_name,
+         quantity, unit_price, customer_id, region) in iter_transactions(
+            raw_lines, discarded_records, tallies):
+        tid_col.append(transaction_id)
+        date_col.append(date)
+        pid_col.append(product_id)
+        pname_col.append(product_name)
+        qty_col.append(quantity)
+        price_col.append(unit_price)
+        cid_col.append(customer_id)
+        region_col.append(region)
+
+    parsed_transactions = Transactions(
+        np.asarray(tid_col, dtype=object),
+        np.asarray(date_col, dtype=object),
+        np.asarray(pid_col, dtype=object),
+        np.asarray(pname_col, dtype=object),
+        np.asarray(qty_col, dtype=np.int64),
+        np.asarray(price_col, dtype=np.float64),
+        np.asarray(cid_col, dtype=object),
+        np.asarray(region_col, dtype=object)
+    )
 
     # Required console output
-    print(f"Total records parsed: {total_records}")
-    print(f"Invalid records removed: {discarded_count}")
+    print(f"Total records parsed: {tallies['total']}")
+    print(f"Invalid records removed: {tallies['discarded']}")
     print(f"Valid records after cleaning: {len(parsed_transactions)}")
 
-    return parsed_transactions, discarded_count, discarded_records
+    return parsed_transactions, tallies["discarded"], discarded_records
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None,
+                        prevalidated=False, precomputed=None):
     """
     Validates transactions and applies optional filters
+
+    Works on the columnar arrays: numeric checks and amounts are
+    vectorized, row selection happens through boolean masks
+
+    prevalidated: skip the validation pass entirely; pass True for
+    transactions coming straight from parse_transactions, whose regex
+    already enforces every rule checked here
+
+    precomputed: summary dict from an earlier call on the same
+    transactions; reuses its region list and amount range instead of
+    rescanning the data for the filter display
     """
 
     total_input = len(transactions)
-    invalid_count = 0
-    valid_transactions = []
 
     # -----------------------------
-    # VALIDATION
+    # VALIDATION (boolean masks)
     # -----------------------------
-    for txn in transactions:
-        try:
-            if txn["Quantity"] <= 0:
-                invalid_count += 1
-                continue
-            if txn["UnitPrice"] <= 0:
-                invalid_count += 1
-                continue
-            if not txn["TransactionID"].startswith("T"):
-                invalid_count += 1
-                continue
-            if not txn["ProductID"].startswith("P"):
-                invalid_count += 1
-                continue
-            if not txn["CustomerID"].startswith("C"):
-                invalid_count += 1
-                continue
-
-            valid_transactions.append(txn)
+    if prevalidated:
+        valid_mask = np.ones(total_input, dtype=bool)
+    elif total_input:
+        # branchless: every predicate is a C-evaluated boolean array,
+        # combined with bitwise ANDs instead of per-row branching; the
+        # one-char prefixes compare as a single vectorized first-char
+        # equality (empty strings yield NaN, which compares False)
+        valid_mask = (
+            (transactions.quantity > 0)
+            & (transactions.unit_price > 0)
+            & (pd.Series(transactions.transaction_id).str[0] == "T").to_numpy()
+            & (pd.Series(transactions.product_id).str[0] == "P").to_numpy()
+            & (pd.Series(transactions.customer_id).str[0] == "C").to_numpy()
+        )
+    else:
+        valid_mask = np.zeros(0, dtype=bool)
 
-        except Exception:
-            invalid_count += 1
-            continue
+    invalid_count = int((~valid_mask).sum())
+    valid_transactions = transactions.select(valid_mask)
 
     # -----------------------------
     # FILTER DISPLAY (ALWAYS)
     # -----------------------------
-    regions = sorted({t["Region"] for t in valid_transactions})
-    print(f"Regions: {', '.join(regions)}")
+    amounts = valid_transactions.amount
 
-    amounts = [t["Quantity"] * t["UnitPrice"] for t in valid_transactions]
-    if amounts:
-        print(f"Amount Range: ₹{min(amounts)} - ₹{max(amounts)}")
+    if precomputed is not None:
+        regions = precomputed["regions"]
+        amount_min = precomputed["amount_min"]
+        amount_max = precomputed["amount_max"]
+    else:
+        regions = sorted(set(valid_transactions.region))
+        amount_min = float(amounts.min()) if amounts.size else None
+        amount_max = float(amounts.max()) if amounts.size else None
+
+    print(f"Regions: {', '.join(regions)}")
+    if amount_min is not None:
+        print(f"Amount Range: ₹{amount_min} - ₹{amount_max}")
 
     # -----------------------------
     # APPLY FILTERS
@@ -189,21 +350,25 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
 
     if region:
         before = len(filtered_transactions)
-        filtered_transactions = [
-            t for t in filtered_transactions
-            if t["Region"].lower() == region.lower()
-        ]
+        target = region.lower()
+        region_mask = (
+            pd.Series(filtered_transactions.region).str.lower() == target
+        ).to_numpy()
+        filtered_transactions = filtered_transactions.select(region_mask)
+        amounts = amounts[region_mask]
 
         filtered_by_region = before - len(filtered_transactions)
         print(f"After region filter: {len(filtered_transactions)} records")
 
     if min_amount is not None or max_amount is not None:
         before = len(filtered_transactions)
-        filtered_transactions = [
-            t for t in filtered_transactions
-            if (min_amount is None or t["Quantity"] * t["UnitPrice"] >= min_amount)
-            and (max_amount is None or t["Quantity"] * t["UnitPrice"] <= max_amount)
-        ]
+        amount_mask = np.ones(before, dtype=bool)
+        if min_amount is not None:
+            amount_mask &= amounts >= min_amount
+        if max_amount is not None:
+            amount_mask &= amounts <= max_amount
+
+        filtered_transactions = filtered_transactions.select(amount_mask)
         filtered_by_amount = before - len(filtered_transactions)
         print(f"After amount filter: {len(filtered_transactions)} records")
 
@@ -215,7 +380,11 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         "invalid": invalid_count,
         "filtered_by_region": filtered_by_region,
         "filtered_by_amount": filtered_by_amount,
-        "final_count": len(filtered_transactions)
+        "final_count": len(filtered_transactions),
+        # display values, reusable via precomputed= on a later call
+        "regions": regions,
+        "amount_min": amount_min,
+        "amount_max": amount_max
     }
 
     return filtered_transactions, invalid_count, summary